@@ -1,133 +1,26 @@
+import io
+import os
 import re
 import json
+import functools
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, TextIO, Iterator
 import html
 
-def load_test_results() -> Dict[str, Any]:
-    results = {}
-    results_path = Path("tests/results.json")
-    
-    if not results_path.exists():
-        raise Exception(f"Test results file not found: {results_path}")
-    
-    with Path.open(results_path, "r") as f:
-        results = json.load(f)
-    
-    if results:
-        return results
-    else:
-        raise Exception("Can't load test results")
+# orjson парсит JSON прямо из bytes и заметно быстрее; без него - стандартный json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-def extract_test_code(test_name: str) -> str:
-    """Извлекает код теста из файлов .cppm"""
-    test_files = list(Path("tests").glob("**/*.cppm"))
-    
-    for file_path in test_files:
-        with Path.open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            # Ищем функцию теста
-            pattern = rf"bool\s+{re.escape(test_name)}\s*\([^)]*\)\s*\{{(.*?)\}}"
-            match = re.search(pattern, content, re.DOTALL)
-            if match:
-                code = match.group(1).strip()
-                # Форматируем код
-                return format_code(code, file_path.name)
-    
-    return "// Code not found"
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+_FUNC_RE = re.compile(r"bool\s+(\w+)\s*\([^)]*\)\s*\{")
 
-def format_code(code: str, filename: str) -> str:
-    """Форматирует код для отображения"""
-    lines = code.split('\n')
-    formatted = []
-    
-    for i, line in enumerate(lines, 1):
-        # Подсветка ключевых слов C++
-        line = html.escape(line)
-        line = re.sub(r'\b(bool|return|if|else|for|while|try|catch|throw|auto|const|static|inline|virtual|override|final|public|private|protected|class|struct|enum|template|typename|namespace|using|import|export|module)\b', 
-                     r'<span class="keyword">\1</span>', line)
-        line = re.sub(r'\b(\\d+)\b', r'<span class="number">\1</span>', line)
-        line = re.sub(r'("[^"]*")', r'<span class="string">\1</span>', line)
-        
-        formatted.append(f'<div class="code-line"><span class="line-number">{i:3d}</span> {line}</div>')
-    
-    return f'<div class="code-block" data-filename="{filename}">' + '\n'.join(formatted) + '</div>'
-
-def generate_html(results: List[Dict[str, Any]]) -> str:
-    """Генерирует HTML страницу"""
-    
-    # Статистика
-    total_tests = sum(r.get("total", 0) for r in results)
-    total_passed = sum(r.get("passed", 0) for r in results)
-    total_failed = sum(r.get("failed", 0) for r in results)
-    success_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
-    
-    # Генерируем HTML для каждого теста
-    test_html = []
-    for i, result in enumerate(results):
-        test_name = result.get("test_name", "Unknown")
-        test_desc = result.get("test_description", "")
-        passed = result.get("passed", 0)
-        failed = result.get("failed", 0)
-        total = result.get("total", 0)
-        success = result.get("success", False)
-        
-        # Статус бейдж
-        status_class = "is-success" if success else "is-danger"
-        status_text = "✓ Passed" if success else "✗ Failed"
-        
-        # Детали тестов
-        details_html = []
-        if "case_results" in result:
-            for case in result["case_results"]:
-                case_name = case.get("name", "")
-                case_desc = case.get("description", "")
-                case_passed = case.get("passed", False)
-                case_error = case.get("error", "")
-                
-                case_status = "success" if case_passed else "danger"
-                case_icon = "✓" if case_passed else "✗"
-                
-                # Код теста
-                test_code = extract_test_code(case_name)
-                
-                details_html.append(f'''
-                <div class="test-case">
-                    <div class="test-case-header" onclick="toggleCode(this)">
-                        <span class="test-case-status has-text-{case_status}">{case_icon}</span>
-                        <span class="test-case-name">{case_name}</span>
-                        <span class="test-case-description">{case_desc}</span>
-                        <span class="toggle-icon">▼</span>
-                    </div>
-                    <div class="test-case-code" style="display: none;">
-                        {test_code}
-                        {f'<div class="error-message">Error: {html.escape(case_error)}</div>' if case_error else ''}
-                    </div>
-                </div>
-                ''')
-        
-        test_html.append(f'''
-        <div class="test-suite">
-            <div class="test-suite-header">
-                <div class="test-suite-title">
-                    <h3>{test_name}</h3>
-                    <span class="tag {status_class}">{status_text}</span>
-                </div>
-                <p class="test-suite-description">{test_desc}</p>
-                <div class="test-stats">
-                    <span class="stat"><span class="has-text-success">{passed}</span> passed</span>
-                    <span class="stat"><span class="has-text-danger">{failed}</span> failed</span>
-                    <span class="stat">{total} total</span>
-                </div>
-            </div>
-            <div class="test-cases">
-                {''.join(details_html)}
-            </div>
-        </div>
-        ''')
-    
-    # Полный HTML
-    return f'''<!DOCTYPE html>
+# Статичные части страницы: пишутся как есть, без форматирования
+_HEAD_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -135,7 +28,7 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
     <title>Light Test Results</title>
     <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bulma@1.0.2/css/bulma.min.css">
     <style>
-        :root {{
+        :root {
             --bg-dark: #1a1e2c;
             --bg-darker: #0f1322;
             --bg-card: #242a3a;
@@ -149,178 +42,178 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
             --keyword-color: #81a1c1;
             --string-color: #a3be8c;
             --number-color: #b48ead;
-        }}
+        }
         
-        body {{
+        body {
             background-color: var(--bg-dark);
             color: var(--text-primary);
             font-family: 'JetBrains Mono', 'Fira Code', monospace;
             padding: 2rem;
             min-height: 100vh;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             font-weight: 600;
             margin-bottom: 1rem;
             color: var(--text-primary);
-        }}
+        }
         
-        h1 .light {{
+        h1 .light {
             color: var(--text-secondary);
             font-weight: 300;
-        }}
+        }
         
-        .summary-card {{
+        .summary-card {
             background: linear-gradient(135deg, var(--bg-card), var(--bg-darker));
             border-radius: 12px;
             padding: 2rem;
             margin-bottom: 2rem;
             box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
             border: 1px solid var(--border-color);
-        }}
+        }
         
-        .summary-stats {{
+        .summary-stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1.5rem;
             margin-top: 1.5rem;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             text-align: center;
             padding: 1rem;
             background: rgba(0, 0, 0, 0.2);
             border-radius: 8px;
             border: 1px solid var(--border-color);
-        }}
+        }
         
-        .stat-value {{
+        .stat-value {
             font-size: 2.5rem;
             font-weight: 700;
             line-height: 1.2;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             color: var(--text-secondary);
             font-size: 0.9rem;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
-        .progress {{
+        .progress {
             height: 8px;
             background: var(--bg-darker);
             border-radius: 4px;
             overflow: hidden;
             margin: 1rem 0;
-        }}
+        }
         
-        .progress-bar {{
+        .progress-bar {
             height: 100%;
             background: linear-gradient(90deg, var(--success-color), #8cc084);
             border-radius: 4px;
             transition: width 0.3s ease;
-        }}
+        }
         
-        .test-suite {{
+        .test-suite {
             background: var(--bg-card);
             border-radius: 10px;
             margin-bottom: 1.5rem;
             overflow: hidden;
             border: 1px solid var(--border-color);
             box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
-        }}
+        }
         
-        .test-suite-header {{
+        .test-suite-header {
             padding: 1.5rem;
             border-bottom: 1px solid var(--border-color);
             background: rgba(0, 0, 0, 0.2);
-        }}
+        }
         
-        .test-suite-title {{
+        .test-suite-title {
             display: flex;
             align-items: center;
             justify-content: space-between;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .test-suite-title h3 {{
+        .test-suite-title h3 {
             font-size: 1.3rem;
             font-weight: 600;
             color: var(--text-primary);
             margin: 0;
-        }}
+        }
         
-        .test-suite-description {{
+        .test-suite-description {
             color: var(--text-secondary);
             margin: 0.5rem 0;
             font-size: 0.95rem;
-        }}
+        }
         
-        .test-stats {{
+        .test-stats {
             display: flex;
             gap: 1rem;
             font-size: 0.9rem;
-        }}
+        }
         
-        .stat {{
+        .stat {
             color: var(--text-secondary);
-        }}
+        }
         
-        .test-cases {{
+        .test-cases {
             padding: 0.5rem;
-        }}
+        }
         
-        .test-case {{
+        .test-case {
             margin: 0.5rem;
             background: var(--bg-darker);
             border-radius: 6px;
             border: 1px solid var(--border-color);
-        }}
+        }
         
-        .test-case-header {{
+        .test-case-header {
             padding: 1rem;
             cursor: pointer;
             display: flex;
             align-items: center;
             gap: 1rem;
             transition: background 0.2s;
-        }}
+        }
         
-        .test-case-header:hover {{
+        .test-case-header:hover {
             background: rgba(255, 255, 255, 0.05);
-        }}
+        }
         
-        .test-case-status {{
+        .test-case-status {
             font-weight: 700;
             min-width: 24px;
-        }}
+        }
         
-        .test-case-name {{
+        .test-case-name {
             font-weight: 600;
             color: var(--text-primary);
             min-width: 200px;
-        }}
+        }
         
-        .test-case-description {{
+        .test-case-description {
             color: var(--text-secondary);
             flex: 1;
             font-size: 0.9rem;
-        }}
+        }
         
-        .toggle-icon {{
+        .toggle-icon {
             color: var(--text-secondary);
             font-size: 0.8rem;
             transition: transform 0.3s;
-        }}
+        }
         
-        .test-case-code {{
+        .test-case-code {
             padding: 1rem;
             border-top: 1px solid var(--border-color);
             background: var(--code-bg);
@@ -328,15 +221,15 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
             font-size: 0.85rem;
             line-height: 1.5;
             overflow-x: auto;
-        }}
+        }
         
-        .code-line {{
+        .code-line {
             display: flex;
             white-space: pre;
             color: #d8dee9;
-        }}
+        }
         
-        .line-number {{
+        .line-number {
             color: var(--line-number-color);
             padding-right: 1.5rem;
             text-align: right;
@@ -344,13 +237,13 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
             min-width: 40px;
             border-right: 1px solid var(--border-color);
             margin-right: 1rem;
-        }}
+        }
         
-        .keyword {{ color: var(--keyword-color); font-weight: 600; }}
-        .string {{ color: var(--string-color); }}
-        .number {{ color: var(--number-color); }}
+        .keyword { color: var(--keyword-color); font-weight: 600; }
+        .string { color: var(--string-color); }
+        .number { color: var(--number-color); }
         
-        .error-message {{
+        .error-message {
             margin-top: 1rem;
             padding: 1rem;
             background: rgba(217, 83, 79, 0.1);
@@ -358,54 +251,298 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
             border-radius: 4px;
             color: var(--danger-color);
             font-family: monospace;
-        }}
+        }
         
-        .tag {{
+        .tag {
             font-size: 0.8rem;
             padding: 0.4rem 0.8rem;
             border-radius: 4px;
             font-weight: 600;
-        }}
+        }
         
-        .tag.is-success {{ background: var(--success-color); color: white; }}
-        .tag.is-danger {{ background: var(--danger-color); color: white; }}
+        .tag.is-success { background: var(--success-color); color: white; }
+        .tag.is-danger { background: var(--danger-color); color: white; }
         
-        .has-text-success {{ color: var(--success-color) !important; }}
-        .has-text-danger {{ color: var(--danger-color) !important; }}
+        .has-text-success { color: var(--success-color) !important; }
+        .has-text-danger { color: var(--danger-color) !important; }
         
-        .timestamp {{
+        .timestamp {
             text-align: right;
             color: var(--text-secondary);
             font-size: 0.85rem;
             margin-top: 2rem;
             padding-top: 1rem;
             border-top: 1px solid var(--border-color);
-        }}
+        }
         
-        ::-webkit-scrollbar {{
+        ::-webkit-scrollbar {
             width: 10px;
             height: 10px;
-        }}
+        }
         
-        ::-webkit-scrollbar-track {{
+        ::-webkit-scrollbar-track {
             background: var(--bg-darker);
-        }}
+        }
         
-        ::-webkit-scrollbar-thumb {{
+        ::-webkit-scrollbar-thumb {
             background: var(--border-color);
             border-radius: 5px;
-        }}
+        }
         
-        ::-webkit-scrollbar-thumb:hover {{
+        ::-webkit-scrollbar-thumb:hover {
             background: #4a5268;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <h1>light_test <span class="light">results</span></h1>
         
-        <div class="summary-card">
+'''
+
+_FOOTER_JS = r'''    <script>
+        function toggleCode(header) {
+            const code = header.nextElementSibling;
+            const icon = header.querySelector('.toggle-icon');
+            
+            if (code.style.display === 'none') {
+                code.style.display = 'block';
+                icon.textContent = '▲';
+            } else {
+                code.style.display = 'none';
+                icon.textContent = '▼';
+            }
+        }
+        
+        // Автоматически открывать упавшие тесты
+        document.querySelectorAll('.test-case').forEach(case_ => {
+            const status = case_.querySelector('.test-case-status');
+            if (status && status.classList.contains('has-text-danger')) {
+                const code = case_.querySelector('.test-case-code');
+                const icon = case_.querySelector('.toggle-icon');
+                if (code) {
+                    code.style.display = 'block';
+                    if (icon) icon.textContent = '▲';
+                }
+            }
+        });
+        
+        // Подсветка синтаксиса C++ в блоках кода
+        const KEYWORDS = new Set([
+            'bool', 'return', 'if', 'else', 'for', 'while', 'try', 'catch', 'throw',
+            'auto', 'const', 'static', 'inline', 'virtual', 'override', 'final',
+            'public', 'private', 'protected', 'class', 'struct', 'enum', 'template',
+            'typename', 'namespace', 'using', 'import', 'export', 'module'
+        ]);
+        const TOKEN_RE = /"[^"]*"|\w+/g;
+        const NEEDS_HIGHLIGHT_RE = /["\w]/;
+        
+        function highlight() {
+            document.querySelectorAll('.code-line').forEach(line => {
+                // Текст строки кода идёт последним узлом после номера строки
+                const text = line.lastChild;
+                if (!text || text.nodeType !== Node.TEXT_NODE) return;
+                
+                const source = text.data;
+                // Пустые строки и строки из одних скобок подсвечивать нечего
+                if (!NEEDS_HIGHLIGHT_RE.test(source)) return;
+                const fragment = document.createDocumentFragment();
+                let last = 0;
+                // Без групп захвата: весь токен берём из m[0]
+                for (const m of source.matchAll(TOKEN_RE)) {
+                    const token = m[0];
+                    let cls = null;
+                    if (token[0] === '"') cls = 'string';
+                    else if (KEYWORDS.has(token)) cls = 'keyword';
+                    else if (/^\d+$/.test(token)) cls = 'number';
+                    if (!cls) continue;
+                    
+                    if (m.index > last) {
+                        fragment.appendChild(document.createTextNode(source.slice(last, m.index)));
+                    }
+                    const span = document.createElement('span');
+                    span.className = cls;
+                    span.textContent = token;
+                    fragment.appendChild(span);
+                    last = m.index + token.length;
+                }
+                if (last === 0) return;
+                if (last < source.length) {
+                    fragment.appendChild(document.createTextNode(source.slice(last)));
+                }
+                line.replaceChild(fragment, text);
+            });
+        }
+        
+        highlight();
+    </script>
+</body>
+</html>
+'''
+
+def load_test_results() -> Tuple[Dict[str, Any], float]:
+    results = {}
+    results_path = Path("tests/results.json")
+    
+    # Один stat: и проверка наличия файла, и время генерации для отчёта
+    try:
+        mtime = results_path.stat().st_mtime
+    except FileNotFoundError:
+        raise Exception(f"Test results file not found: {results_path}")
+    
+    results = _json_loads(results_path.read_bytes())
+    
+    if results:
+        return results, mtime
+    else:
+        raise Exception("Can't load test results")
+
+def _iter_cppm(root: str) -> Iterator[str]:
+    """Рекурсивно обходит root через os.scandir и отдаёт пути к файлам .cppm"""
+    # Как и Path.glob("**/*.cppm"): сначала файлы каталога, потом подкаталоги
+    subdirs = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith(".cppm"):
+                yield entry.path
+    for subdir in subdirs:
+        yield from _iter_cppm(subdir)
+
+def _read_source(path: str) -> Tuple[str, str]:
+    """Читает файл и возвращает пару (имя файла, содержимое)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return os.path.basename(path), f.read()
+
+@functools.lru_cache(maxsize=None)
+def _load_cppm_sources() -> List[Tuple[str, str]]:
+    """Читает все файлы .cppm один раз и возвращает пары (имя файла, содержимое)"""
+    test_files = list(_iter_cppm("tests"))
+    
+    # Чтение файлов упирается в I/O, поэтому читаем их параллельно
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(_read_source, test_files))
+
+_NUMBER_LITERAL_CHARS = frozenset("0123456789abcdefABCDEFxX'")
+_RAW_STRING_PREFIXES = frozenset({"R", "LR", "uR", "UR", "u8R"})
+
+def _preceding_word(content: str, i: int) -> str:
+    """Возвращает идентификатор/число, стоящее вплотную перед позицией i"""
+    j = i
+    while j > 0 and (content[j - 1].isalnum() or content[j - 1] == '_'):
+        j -= 1
+    return content[j:i]
+
+def _is_digit_separator(content: str, i: int) -> bool:
+    """Проверяет, что апостроф в позиции i - разделитель разрядов (1'000, 0xFF'FF)"""
+    j = i
+    while j > 0 and content[j - 1] in _NUMBER_LITERAL_CHARS:
+        j -= 1
+    if j == i or not content[j].isdigit():
+        return False
+    # Цифра не должна быть хвостом идентификатора или префикса вроде u8'x'
+    return j == 0 or not (content[j - 1].isalnum() or content[j - 1] == '_')
+
+def _find_closing_brace(content: str, start: int) -> int:
+    """Возвращает индекс '}', закрывающего блок, который начинается с позиции start"""
+    depth = 1
+    i = start
+    n = len(content)
+    while i < n:
+        c = content[i]
+        if c == '"' and _preceding_word(content, i) in _RAW_STRING_PREFIXES:
+            # Сырая строка R"delim(...)delim" - экранирования внутри нет
+            paren = content.find('(', i + 1)
+            if paren == -1:
+                break
+            delim = content[i + 1:paren]
+            i = content.find(')' + delim + '"', paren + 1)
+            if i == -1:
+                break
+            i += len(delim) + 1
+        elif c == '"' or (c == "'" and not _is_digit_separator(content, i)):
+            # Пропускаем строковый/символьный литерал вместе с экранированием;
+            # префиксы L/u/U/u8 идут до кавычки и на разбор не влияют
+            i += 1
+            while i < n and content[i] != c:
+                i += 2 if content[i] == '\\' else 1
+        elif content.startswith('//', i):
+            i = content.find('\n', i)
+            if i == -1:
+                break
+        elif content.startswith('/*', i):
+            i = content.find('*/', i + 2)
+            if i == -1:
+                break
+            i += 1
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return n
+
+@functools.lru_cache(maxsize=None)
+def _load_test_bodies() -> Dict[str, Tuple[str, str]]:
+    """Один проход по каждому файлу: имя функции теста -> (тело, имя файла)"""
+    bodies = {}
+    for filename, content in _load_cppm_sources():
+        pos = 0
+        while True:
+            match = _FUNC_RE.search(content, pos)
+            if not match:
+                break
+            end = _find_closing_brace(content, match.end())
+            bodies.setdefault(match.group(1), (content[match.end():end], filename))
+            pos = end + 1
+    return bodies
+
+@functools.lru_cache(maxsize=None)
+def extract_test_code(test_name: str) -> str:
+    """Извлекает код теста из файлов .cppm"""
+    found = _load_test_bodies().get(test_name)
+    if found is None:
+        return "// Code not found"
+    
+    code, filename = found
+    # Форматируем код
+    return format_code(code.strip(), filename)
+
+@functools.lru_cache(maxsize=4096)
+def format_code(code: str, filename: str) -> str:
+    """Форматирует код для отображения"""
+    buf = io.StringIO()
+    buf.write(f'<div class="code-block" data-filename="{filename}">')
+    
+    # Только экранируем: подсветку синтаксиса делает highlight() в браузере.
+    # Экранируем всё тело за один вызов, а не каждую строку отдельно
+    escaped = code.translate(_HTML_ESCAPE_TABLE)
+    
+    for i, line in enumerate(escaped.split('\n'), 1):
+        if i > 1:
+            buf.write('\n')
+        buf.write(f'<div class="code-line"><span class="line-number">{i:3d}</span> {line}</div>')
+    
+    buf.write('</div>')
+    return buf.getvalue()
+
+def write_html(results: List[Dict[str, Any]], mtime: float, f: TextIO) -> None:
+    """Генерирует HTML страницу и пишет её в f по частям"""
+    
+    # Статистика (один проход по результатам)
+    total_tests = total_passed = total_failed = 0
+    for r in results:
+        total_tests += r.get("total", 0)
+        total_passed += r.get("passed", 0)
+        total_failed += r.get("failed", 0)
+    success_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
+    
+    # Шапка страницы и сводка
+    f.write(_HEAD_HTML)
+    f.write(f'''        <div class="summary-card">
             <h2 class="title is-4" style="color: var(--text-primary);">Summary</h2>
             <div class="progress">
                 <div class="progress-bar" style="width: {success_rate:.1f}%;"></div>
@@ -431,59 +568,101 @@ def generate_html(results: List[Dict[str, Any]]) -> str:
         </div>
         
         <div class="test-results">
-            {''.join(test_html)}
+            ''')
+    
+    # HTML для каждого теста пишем сразу, не накапливая его в памяти
+    for result in results:
+        test_name = result.get("test_name", "Unknown")
+        test_desc = result.get("test_description", "")
+        passed = result.get("passed", 0)
+        failed = result.get("failed", 0)
+        total = result.get("total", 0)
+        success = result.get("success", False)
+        
+        # Статус бейдж
+        status_class = "is-success" if success else "is-danger"
+        status_text = "✓ Passed" if success else "✗ Failed"
+        
+        f.write(f'''
+        <div class="test-suite">
+            <div class="test-suite-header">
+                <div class="test-suite-title">
+                    <h3>{test_name}</h3>
+                    <span class="tag {status_class}">{status_text}</span>
+                </div>
+                <p class="test-suite-description">{test_desc}</p>
+                <div class="test-stats">
+                    <span class="stat"><span class="has-text-success">{passed}</span> passed</span>
+                    <span class="stat"><span class="has-text-danger">{failed}</span> failed</span>
+                    <span class="stat">{total} total</span>
+                </div>
+            </div>
+            <div class="test-cases">
+                ''')
+        
+        # Детали тестов
+        for case in result.get("case_results", ()):
+            case_name = case.get("name", "")
+            case_desc = case.get("description", "")
+            case_passed = case.get("passed", False)
+            case_error = case.get("error", "")
+            
+            case_status = "success" if case_passed else "danger"
+            case_icon = "✓" if case_passed else "✗"
+            
+            # Код теста
+            test_code = extract_test_code(case_name)
+            
+            f.write(f'''
+                <div class="test-case">
+                    <div class="test-case-header" onclick="toggleCode(this)">
+                        <span class="test-case-status has-text-{case_status}">{case_icon}</span>
+                        <span class="test-case-name">{case_name}</span>
+                        <span class="test-case-description">{case_desc}</span>
+                        <span class="toggle-icon">▼</span>
+                    </div>
+                    <div class="test-case-code" style="display: none;">
+                        {test_code}
+                        {f'<div class="error-message">Error: {html.escape(case_error)}</div>' if case_error else ''}
+                    </div>
+                </div>
+                ''')
+        
+        f.write('''
+            </div>
+        </div>
+        ''')
+    
+    # Подвал страницы
+    f.write(f'''
         </div>
         
         <div class="timestamp">
-            Generated on {Path('tests/results.json').stat().st_mtime}
+            Generated on {datetime.fromtimestamp(mtime).isoformat(timespec='seconds')}
         </div>
     </div>
     
-    <script>
-        function toggleCode(header) {{
-            const code = header.nextElementSibling;
-            const icon = header.querySelector('.toggle-icon');
-            
-            if (code.style.display === 'none') {{
-                code.style.display = 'block';
-                icon.textContent = '▲';
-            }} else {{
-                code.style.display = 'none';
-                icon.textContent = '▼';
-            }}
-        }}
-        
-        // Автоматически открывать упавшие тесты
-        document.querySelectorAll('.test-case').forEach(case_ => {{
-            const status = case_.querySelector('.test-case-status');
-            if (status && status.classList.contains('has-text-danger')) {{
-                const code = case_.querySelector('.test-case-code');
-                const icon = case_.querySelector('.toggle-icon');
-                if (code) {{
-                    code.style.display = 'block';
-                    if (icon) icon.textContent = '▲';
-                }}
-            }}
-        }});
-    </script>
-</body>
-</html>
-'''
+''')
+    f.write(_FOOTER_JS)
 
 def main():
     # Загружаем результаты тестов
-    results_data = load_test_results()
+    results_data, mtime = load_test_results()
     
     # Преобразуем в список если это одиночный результат
     results = results_data if isinstance(results_data, list) else [results_data]
     
-    # Генерируем HTML
-    html_content = generate_html(results)
-    
-    # Сохраняем в файл
+    # Генерируем HTML во временный файл рядом и подменяем отчёт только при успехе,
+    # чтобы ошибка посреди генерации не оставила вместо старого отчёта обрезанный
     output_path = Path("tests/results.html")
-    with Path.open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with Path.open(tmp_path, "w", encoding="utf-8") as f:
+            write_html(results, mtime, f)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     
     print(f"✅ Test results HTML generated: {output_path.absolute()}")
     print(f"📊 Summary: {sum(r.get('total', 0) for r in results) if isinstance(results, dict) else results} tests total")
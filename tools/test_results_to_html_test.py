@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from test_results_to_html import _find_closing_brace, _iter_cppm, _FUNC_RE
+
+
+def body_of(content: str) -> str:
+    """Тело первой функции bool в content, как его видит генератор отчёта"""
+    match = _FUNC_RE.search(content)
+    return content[match.end():_find_closing_brace(content, match.end())]
+
+
+class FindClosingBraceTests(unittest.TestCase):
+    def test_nested_blocks_and_lambdas(self):
+        src = "bool t(){ auto f = [&]() { return 1; }; if (f()) { return true; } return false; } rest"
+        self.assertEqual(body_of(src), " auto f = [&]() { return 1; }; if (f()) { return true; } return false; ")
+
+    def test_braces_in_strings_and_comments(self):
+        src = 'bool t(){ s = "}{\\"}"; c = \'}\'; // }\n /* } */ return true; } rest'
+        self.assertTrue(body_of(src).endswith("return true; "))
+
+    def test_digit_separators(self):
+        src = "bool t(){ int a = 1'000'000; int b = 0xFF'FF; c = '{'; return true; } rest"
+        self.assertTrue(body_of(src).endswith("return true; "))
+
+    def test_prefixed_char_literals(self):
+        for prefix in ("L", "u", "U", "u8"):
+            with self.subTest(prefix=prefix):
+                src = f"bool t(){{ auto c = {prefix}'{{'; return c != 0; }}\nbool u(){{ return true; }}"
+                self.assertEqual(body_of(src), f" auto c = {prefix}'{{'; return c != 0; ")
+
+    def test_raw_strings(self):
+        src = 'bool t(){ auto s = R"x(}" )" {)x"; auto r = u8R"(})"; return true; }\nbool u(){ return true; }'
+        self.assertTrue(body_of(src).endswith("return true; "))
+        self.assertNotIn("bool u", body_of(src))
+
+
+class IterCppmTests(unittest.TestCase):
+    def test_matches_glob_order(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel in ("a/x.cppm", "b.cppm", "a/c/y.cppm", "z.cppm", "a/w.txt"):
+                path = Path(root, rel)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.touch()
+            
+            expected = [str(p) for p in Path(root).glob("**/*.cppm")]
+            self.assertEqual([os.path.normpath(p) for p in _iter_cppm(root)], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()